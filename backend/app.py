@@ -1,32 +1,81 @@
-from flask import Flask, request, jsonify
-from flask_cors import CORS
+from quart import Quart, request, jsonify, make_response
+from quart.utils import run_sync
+from quart.json.provider import DefaultJSONProvider
+from quart_cors import cors
+from werkzeug.exceptions import HTTPException
 from services.git_service import GitService
 from services.ai_service import AIService
-from services.github_service import GitHubService
+from services.github_service import github_service
+from services.log_parser import CLI_COMMIT_LINE_RE, parse_cli_log, parse_pasted_log
 import os
+import orjson
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 
 
 # Load environment variables from .env file
 load_dotenv()
 
-app = Flask(__name__)
+# Logging: handlers only put records on a queue, and a background thread
+# writes them to stderr, so request handlers never wait on log I/O. Hypercorn
+# runs several worker processes, which must not rotate one shared log file;
+# stderr is collected by the process manager / platform instead, and records
+# are tagged with the worker's PID.
+log_formatter = logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(process)d]: %(message)s")
+console_handler = logging.StreamHandler()
+console_handler.setFormatter(log_formatter)
+
+log_queue = queue.SimpleQueue()
+# Records are formatted by the listener's handlers, not on the queue side
+logging.basicConfig(level=logging.INFO, format="%(message)s", handlers=[QueueHandler(log_queue)])
+log_listener = QueueListener(log_queue, console_handler)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+logger = logging.getLogger("shipnote")
+
+# Quart is the async version of Flask: routes can await Claude / GitHub calls
+# instead of blocking a worker for the whole round-trip
+app = Quart(__name__)
+
+
+class ORJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, which is several times faster than the json module"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
+# Used by jsonify() and request.get_json()
+app.json = ORJSONProvider(app)
 
 # Enable CORS (Cross-Origin Resource Sharing) allows Next.js frontend (running on a different port) to call this API
-CORS(app)
+app = cors(app)
+
+# Request size limits keep one oversized payload from tying up a worker
+# (and a Claude call) for minutes; override them with environment variables
+MAX_COMMITS = int(os.getenv("SHIPNOTE_MAX_COMMITS", "1000"))
+MAX_LOG_TEXT_CHARS = int(os.getenv("SHIPNOTE_MAX_LOG_TEXT_CHARS", "2000000"))
+app.config["MAX_CONTENT_LENGTH"] = int(os.getenv("SHIPNOTE_MAX_CONTENT_LENGTH", str(5 * 1024 * 1024)))
 
 # Initialize services
 # GitService: Handles reading git repositories
 # AIService: Handles AI generation with Claude
-# GitHubService: Handles GitHub OAuth and API interactions
+# github_service: Handles GitHub OAuth and API interactions (module-level singleton)
+# Git calls are blocking, so routes run them in a thread with run_sync()
 git_service = GitService()
 ai_service = AIService()
-github_service = GitHubService()
 
 
 # Server Running Endpoint
 @app.route('/health', methods=['GET'])
-def health_check():
+async def health_check():
     """
     The CORE endpoint of ShipNote!
     
@@ -56,12 +105,82 @@ def health_check():
     return jsonify({"status": "healthy"}), 200
 
 
+@app.after_serving
+async def close_github_client():
+    """Close the GitHub HTTP/2 connection when the server shuts down"""
+    await github_service.aclose()
+
+
+@app.before_request
+async def reject_oversized_body():
+    """Answer 413 before reading a body larger than MAX_CONTENT_LENGTH"""
+    if request.content_length and request.content_length > app.config["MAX_CONTENT_LENGTH"]:
+        return jsonify({
+            "success": False,
+            "error": f"Request body too large (max {app.config['MAX_CONTENT_LENGTH']} bytes)"
+        }), 413
+
+
+def http_error(error):
+    """
+    Error response for an HTTPException raised while reading the request body,
+    e.g. 413 for a chunked body over MAX_CONTENT_LENGTH (which the before_request
+    check cannot see) or 400 for malformed JSON
+    """
+    return jsonify({
+        "success": False,
+        "error": error.description
+    }), error.code
+
+
+def too_many_commits():
+    """Error response for requests over MAX_COMMITS"""
+    return jsonify({
+        "success": False,
+        "error": f"Too many commits (max {MAX_COMMITS})"
+    }), 413
+
+
+def parse_limit(data, default):
+    """The request's "limit" as a positive int, or None if it isn't one"""
+    try:
+        limit = int(data.get('limit', default))
+    except (TypeError, ValueError):
+        return None
+    return limit if limit > 0 else None
+
+
+def invalid_limit():
+    """Error response for a "limit" that is not a positive integer"""
+    return jsonify({
+        "success": False,
+        "error": "limit must be a positive integer"
+    }), 400
+
+
+def sse_event(event):
+    """Format a dict as one Server-Sent Events message"""
+    return f"data: {orjson.dumps(event).decode()}\n\n"
+
+
+async def sse_response(events):
+    """Wrap an async generator of SSE messages in a streaming response"""
+    response = await make_response(events, {
+        "Content-Type": "text/event-stream",
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"  # Stop proxies (nginx, Render) from buffering the stream
+    })
+    # Claude can take longer than Quart's default response timeout
+    response.timeout = None
+    return response
+
+
 # Main CHANGELOG Generation Endpoint
 @app.route('/api/generate-notes', methods=['POST']) 
-def generate_notes():
+async def generate_notes():
     try:
         # Extract data from the incoming request
-        data = request.json
+        data = await request.get_json()
         commits = data.get('commits', [])
         from_ref = data.get('from', None)
         to_ref = data.get('to', 'HEAD')
@@ -73,10 +192,27 @@ def generate_notes():
                 "error": "No commits provided"
             }), 400
         
+        if len(commits) > MAX_COMMITS:
+            return too_many_commits()
+        
+        # Streaming mode: send the notes as Server-Sent Events while Claude writes them
+        # Events: {"text": "..."} chunks, then {"done": true, ...} or {"error": "..."}
+        if data.get('stream'):
+            async def events():
+                try:
+                    async for text in ai_service.stream_release_notes(commits, from_ref, to_ref):
+                        yield sse_event({"text": text})
+                    yield sse_event({"done": True, "commit_count": len(commits)})
+                except Exception as e:
+                    logger.exception("generate_notes stream failed")
+                    yield sse_event({"error": str(e)})
+
+            return await sse_response(events())
+        
         # Call our AI service to generate the release notes
         # This is where the magic happens - Claude reads the commits
         # and turns them into human-readable notes
-        release_notes = ai_service.generate_release_notes(commits, from_ref, to_ref)
+        release_notes = await ai_service.generate_release_notes(commits, from_ref, to_ref)
         
         # Return success response with the generated notes
         return jsonify({
@@ -85,9 +221,11 @@ def generate_notes():
             "commit_count": len(commits)
         }), 200
         
+    except HTTPException as e:
+        return http_error(e)
     except Exception as e:
         # If anything goes wrong, return an error response
-        print(f"Error in generate_notes: {str(e)}")  # Log to console for debugging
+        logger.exception("generate_notes failed")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -95,7 +233,7 @@ def generate_notes():
     
 
 @app.route('/api/fetch-commits', methods=['POST'])
-def fetch_commits():
+async def fetch_commits():
     """
     This endpoint reads commits directly from a local git repository.
     Useful for the CLI tool that has direct access to the repo.
@@ -125,7 +263,7 @@ def fetch_commits():
 
     try:
         # Extract parameters from request
-        data = request.json
+        data = await request.get_json()
         repo_path = data.get('repo_path')
         from_ref = data.get('from', None)
         to_ref = data.get('to', 'HEAD')
@@ -138,7 +276,7 @@ def fetch_commits():
             }), 400
         
         # Use GitService to extract commits from the repository
-        commits = git_service.get_commits(repo_path, from_ref, to_ref)
+        commits = await run_sync(git_service.get_commits)(repo_path, from_ref, to_ref)
         
         # Return the commits
         return jsonify({
@@ -147,9 +285,11 @@ def fetch_commits():
             "count": len(commits)
         }), 200
         
+    except HTTPException as e:
+        return http_error(e)
     except Exception as e:
         # Handle errors (e.g., invalid repo path, git errors)
-        print(f"Error in fetch_commits: {str(e)}")
+        logger.exception("fetch_commits failed")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -158,24 +298,30 @@ def fetch_commits():
 
 # Combined Endpoint: FETCH + GENERATE
 @app.route('/api/generate-from-repo', methods=['POST'])
-def generate_from_repo():
+async def generate_from_repo():
     try:
-        data = request.json
+        data = await request.get_json()
         repo_path = data.get('repo_path')
         from_ref = data.get('from', None)
         to_ref = data.get('to', 'HEAD')
-        limit = data.get('limit', 50)  # NEW: Accept limit parameter (default 50)
+        limit = parse_limit(data, 50)  # NEW: Accept limit parameter (default 50)
         
         if not repo_path:
             return jsonify({"success": False, "error": "Repository path is required"}), 400
         
+        if limit is None:
+            return invalid_limit()
+        
+        if limit > MAX_COMMITS:
+            return too_many_commits()
+        
         # Pass limit to git_service
-        commits = git_service.get_commits(repo_path, from_ref, to_ref, limit=limit)
+        commits = await run_sync(git_service.get_commits)(repo_path, from_ref, to_ref, limit=limit)
         
         if not commits:
             return jsonify({"success": False, "error": "No commits found in the specified range"}), 400
         
-        release_notes = ai_service.generate_release_notes(commits, from_ref, to_ref)
+        release_notes = await ai_service.generate_release_notes(commits, from_ref, to_ref)
         
         return jsonify({
             "success": True,
@@ -184,14 +330,16 @@ def generate_from_repo():
             "commit_count": len(commits)
         }), 200
         
+    except HTTPException as e:
+        return http_error(e)
     except Exception as e:
-        print(f"Error in generate_from_repo: {str(e)}")
+        logger.exception("generate_from_repo failed")
         return jsonify({"success": False, "error": str(e)}), 500
     
 
 # Quick PASTE ENDPOINT (For Website)
 @app.route('/api/generate-from-text', methods=['POST'])
-def generate_from_text():
+async def generate_from_text():
     """
     Simplified endpoint for the website where users paste raw git log text.
     
@@ -200,6 +348,8 @@ def generate_from_text():
         "git_log_text": "a83b1c9 fix(auth): resolve password reset token bug\nb1d4e2a feat(ui): add new dark mode toggle\n..."
     }
     
+    or the raw git log itself as a text/plain body (used by the CLI).
+    
     Returns JSON:
     {
         "success": true,
@@ -207,8 +357,11 @@ def generate_from_text():
     }
     """
     try:
-        data = request.json
-        git_log_text = data.get('git_log_text', '')
+        if request.mimetype == 'text/plain':
+            git_log_text = await request.get_data(as_text=True)
+        else:
+            data = await request.get_json()
+            git_log_text = data.get('git_log_text', '')
         
         if not git_log_text.strip():
             return jsonify({
@@ -216,30 +369,18 @@ def generate_from_text():
                 "error": "No git log text provided"
             }), 400
         
-        # Parse the raw text into commit objects
-        # Each line is assumed to be: <hash> <message>
-        commits = []
-        for idx, line in enumerate(git_log_text.strip().split('\n')):
-            line = line.strip()
-            if not line:
-                continue
-            
-            # Try to extract hash and message
-            parts = line.split(' ', 1)
-            if len(parts) >= 2:
-                hash_val = parts[0]
-                message = parts[1]
-            else:
-                # If no hash detected, treat entire line as message
-                hash_val = f"commit-{idx}"
-                message = line
-            
-            commits.append({
-                "hash": hash_val,
-                "message": message,
-                "author": "Unknown",
-                "date": ""
-            })
+        if len(git_log_text) > MAX_LOG_TEXT_CHARS:
+            return jsonify({
+                "success": False,
+                "error": f"Git log text too large (max {MAX_LOG_TEXT_CHARS} characters)"
+            }), 413
+        
+        # Parse the raw text into commit objects: the CLI's "hash|date|author|subject"
+        # log groups file lines under each commit, anything else is one commit per line
+        if CLI_COMMIT_LINE_RE.search(git_log_text):
+            commits = parse_cli_log(git_log_text)
+        else:
+            commits = parse_pasted_log(git_log_text)
         
         if not commits:
             return jsonify({
@@ -247,8 +388,11 @@ def generate_from_text():
                 "error": "Could not parse any commits from the provided text"
             }), 400
         
+        if len(commits) > MAX_COMMITS:
+            return too_many_commits()
+        
         # Generate release notes
-        release_notes = ai_service.generate_release_notes(commits, None, 'HEAD')
+        release_notes = await ai_service.generate_release_notes(commits, None, 'HEAD')
         
         return jsonify({
             "success": True,
@@ -256,8 +400,10 @@ def generate_from_text():
             "commit_count": len(commits)
         }), 200
         
+    except HTTPException as e:
+        return http_error(e)
     except Exception as e:
-        print(f"Error in generate_from_text: {str(e)}")
+        logger.exception("generate_from_text failed")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -269,7 +415,7 @@ def generate_from_text():
 # ===========================
 
 @app.route('/api/github/auth', methods=['POST'])
-def github_auth():
+async def github_auth():
     """
     Exchange GitHub OAuth code for access token.
     
@@ -291,7 +437,7 @@ def github_auth():
     }
     """
     try:
-        data = request.json
+        data = await request.get_json()
         code = data.get('code')
         
         if not code:
@@ -301,7 +447,7 @@ def github_auth():
             }), 400
         
         # Exchange code for access token
-        token_result = github_service.exchange_code_for_token(code)
+        token_result = await github_service.exchange_code_for_token(code)
         
         if not token_result.get('success'):
             return jsonify(token_result), 400
@@ -309,7 +455,7 @@ def github_auth():
         access_token = token_result.get('access_token')
         
         # Get user information
-        user_result = github_service.get_user_info(access_token)
+        user_result = await github_service.get_user_info(access_token)
         
         if not user_result.get('success'):
             return jsonify({
@@ -328,8 +474,10 @@ def github_auth():
             }
         }), 200
         
+    except HTTPException as e:
+        return http_error(e)
     except Exception as e:
-        print(f"Error in github_auth: {str(e)}")
+        logger.exception("github_auth failed")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -337,7 +485,7 @@ def github_auth():
 
 
 @app.route('/api/github/repositories', methods=['POST'])
-def get_github_repositories():
+async def get_github_repositories():
     """
     Get user's GitHub repositories.
     
@@ -365,7 +513,7 @@ def get_github_repositories():
     }
     """
     try:
-        data = request.json
+        data = await request.get_json()
         access_token = data.get('access_token')
         
         if not access_token:
@@ -374,11 +522,13 @@ def get_github_repositories():
                 "error": "Access token is required"
             }), 400
         
-        result = github_service.get_user_repositories(access_token)
+        result = await github_service.get_user_repositories(access_token)
         return jsonify(result), 200 if result.get('success') else 400
         
+    except HTTPException as e:
+        return http_error(e)
     except Exception as e:
-        print(f"Error in get_github_repositories: {str(e)}")
+        logger.exception("get_github_repositories failed")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -386,7 +536,7 @@ def get_github_repositories():
 
 
 @app.route('/api/github/commits', methods=['POST'])
-def fetch_github_commits():
+async def fetch_github_commits():
     """
     Fetch commits from a GitHub repository using OAuth token.
     
@@ -417,13 +567,13 @@ def fetch_github_commits():
     }
     """
     try:
-        data = request.json
+        data = await request.get_json()
         access_token = data.get('access_token')
         owner = data.get('owner')
         repo = data.get('repo')
         since = data.get('since')
         until = data.get('until')
-        limit = data.get('limit', 100)
+        limit = parse_limit(data, 100)
         
         if not access_token:
             return jsonify({
@@ -431,20 +581,28 @@ def fetch_github_commits():
                 "error": "Access token is required"
             }), 400
         
+        if limit is None:
+            return invalid_limit()
+        
+        if limit > MAX_COMMITS:
+            return too_many_commits()
+        
         if not owner or not repo:
             return jsonify({
                 "success": False,
                 "error": "Owner and repository name are required"
             }), 400
         
-        result = github_service.fetch_repo_commits(
+        result = await github_service.fetch_repo_commits(
             access_token, owner, repo, since, until, limit
         )
         
         return jsonify(result), 200 if result.get('success') else 400
         
+    except HTTPException as e:
+        return http_error(e)
     except Exception as e:
-        print(f"Error in fetch_github_commits: {str(e)}")
+        logger.exception("fetch_github_commits failed")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -452,7 +610,7 @@ def fetch_github_commits():
 
 
 @app.route('/api/github/parse-url', methods=['POST'])
-def parse_github_url():
+async def parse_github_url():
     """
     Parse a GitHub repository URL to extract owner and repo name.
     
@@ -469,7 +627,7 @@ def parse_github_url():
     }
     """
     try:
-        data = request.json
+        data = await request.get_json()
         url = data.get('url')
         
         if not url:
@@ -492,8 +650,10 @@ def parse_github_url():
             "repo": parsed['repo']
         }), 200
         
+    except HTTPException as e:
+        return http_error(e)
     except Exception as e:
-        print(f"Error in parse_github_url: {str(e)}")
+        logger.exception("parse_github_url failed")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -501,7 +661,7 @@ def parse_github_url():
 
 
 @app.route('/api/github/generate-from-url', methods=['POST'])
-def generate_from_github_url():
+async def generate_from_github_url():
     """
     Complete workflow: Parse GitHub URL → Fetch commits → Generate changelog.
     
@@ -523,12 +683,12 @@ def generate_from_github_url():
     }
     """
     try:
-        data = request.json
+        data = await request.get_json()
         access_token = data.get('access_token')
         repo_url = data.get('repo_url')
         since = data.get('since')
         until = data.get('until')
-        limit = data.get('limit', 100)
+        limit = parse_limit(data, 100)
         
         if not access_token:
             return jsonify({
@@ -542,6 +702,12 @@ def generate_from_github_url():
                 "error": "Repository URL is required"
             }), 400
         
+        if limit is None:
+            return invalid_limit()
+        
+        if limit > MAX_COMMITS:
+            return too_many_commits()
+        
         # Step 1: Parse the GitHub URL
         parsed = github_service.parse_github_url(repo_url)
         if not parsed:
@@ -553,8 +719,37 @@ def generate_from_github_url():
         owner = parsed['owner']
         repo = parsed['repo']
         
+        # Streaming mode: report each stage as a Server-Sent Event, then stream the notes
+        # Events: {"stage": "fetching"}, {"stage": "generating", "commits": [...], "commit_count": n},
+        # {"text": "..."} chunks, then {"done": true, ...} or {"error": "..."}
+        if data.get('stream'):
+            async def events():
+                try:
+                    yield sse_event({"stage": "fetching"})
+                    commits_result = await github_service.fetch_repo_commits(
+                        access_token, owner, repo, since, until, limit
+                    )
+                    if not commits_result.get('success'):
+                        yield sse_event({"error": commits_result.get('error')})
+                        return
+                    
+                    commits = commits_result.get('commits', [])
+                    if not commits:
+                        yield sse_event({"error": "No commits found in the specified range"})
+                        return
+                    
+                    yield sse_event({"stage": "generating", "commits": commits, "commit_count": len(commits)})
+                    async for text in ai_service.stream_release_notes(commits, since, until or 'HEAD'):
+                        yield sse_event({"text": text})
+                    yield sse_event({"done": True, "commit_count": len(commits)})
+                except Exception as e:
+                    logger.exception("generate_from_github_url stream failed")
+                    yield sse_event({"error": str(e)})
+
+            return await sse_response(events())
+        
         # Step 2: Fetch commits from GitHub
-        commits_result = github_service.fetch_repo_commits(
+        commits_result = await github_service.fetch_repo_commits(
             access_token, owner, repo, since, until, limit
         )
         
@@ -570,7 +765,7 @@ def generate_from_github_url():
             }), 400
         
         # Step 3: Generate release notes from commits
-        release_notes = ai_service.generate_release_notes(commits, since, until or 'HEAD')
+        release_notes = await ai_service.generate_release_notes(commits, since, until or 'HEAD')
         
         # Step 4: Return everything
         return jsonify({
@@ -580,8 +775,10 @@ def generate_from_github_url():
             "commit_count": len(commits)
         }), 200
         
+    except HTTPException as e:
+        return http_error(e)
     except Exception as e:
-        print(f"Error in generate_from_github_url: {str(e)}")
+        logger.exception("generate_from_github_url failed")
         return jsonify({
             "success": False,
             "error": str(e)
@@ -604,8 +801,12 @@ if __name__ == '__main__':
     else:
         print("GitHub OAuth configured successfully")
 
+    # Debug mode (debugger + reloader) only when FLASK_DEBUG=1
+    debug = os.getenv("FLASK_DEBUG", "0") == "1"
+    port = int(os.getenv("PORT", "5000"))
+
     print("\nShipNote Backend starting...")
-    print("API available at: http://localhost:5000")
-    print("Health check: http://localhost:5000/health")
+    print(f"API available at: http://localhost:{port}")
+    print(f"Health check: http://localhost:{port}/health")
     print("\n")
-    app.run()
+    app.run(debug=debug, port=port, use_reloader=debug)
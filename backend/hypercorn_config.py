@@ -0,0 +1,28 @@
+"""
+Hypercorn settings for running ShipNote in production
+======================================================
+Usage: hypercorn -c file:hypercorn_config.py app:app
+
+Every endpoint is I/O-bound (Claude, GitHub, git), so each worker serves
+many in-flight requests on its event loop; more workers only add CPU headroom.
+"""
+
+import os
+import importlib.util
+
+bind = [f"0.0.0.0:{os.getenv('PORT', '5000')}"]
+
+# Render (and Heroku-style hosts) set WEB_CONCURRENCY to the suggested worker count
+workers = int(os.getenv("WEB_CONCURRENCY", "4"))
+
+# uvloop is a faster drop-in event loop; it is not available on Windows
+worker_class = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+
+# Keep idle client connections open between requests (seconds)
+keep_alive_timeout = 75
+
+# Queue of pending connections per worker
+backlog = 1000
+
+accesslog = "-"
+errorlog = "-"
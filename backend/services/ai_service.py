@@ -1,46 +1,24 @@
-import anthropic
+import asyncio
+import hashlib
+import json
+import logging
 import os
-from typing import Dict, Any
-from dotenv import load_dotenv
+import re
+from typing import AsyncIterator, Dict, Any, Optional
 
-load_dotenv()
+from .cache import LRUCache
 
-class AIService:
-    def __init__(self):
-        self.api_key = os.getenv("ANTHROPIC_API_KEY")
-        
-        if not self.api_key:
-            raise ValueError(
-                "ANTHROPIC_API_KEY not found. "
-                "Please set it in your .env file or environment variables. "
-                "Get your API key from: https://console.anthropic.com/"
-            )
-        
-        self.client = anthropic.Anthropic(api_key=self.api_key)
-    
-    def generate_release_notes(self, commits: list, from_ref: str = None, to_ref: str = 'HEAD') -> str:
-        """
-        Generate release notes from a list of commits.
-        This method is called by app.py endpoints.
-        
-        Args:
-            commits: List of commit dictionaries with hash, message, author, date
-            from_ref: Starting reference (optional)
-            to_ref: Ending reference
-            
-        Returns:
-            Markdown-formatted release notes as a string
-        """
-        # Format commits into readable text
-        commit_text = "\n".join([
-            f"- {commit['message']} - by {commit.get('author', 'Unknown')} ({commit['date']})" for commit in commits
-        ])
-        git_log = f"Commits from {from_ref or 'start'} to {to_ref}:\n\n{commit_text}"
-        result = self.generate_changelog(git_log)
-        return result['changelog'] if result['success'] else ''
-        
-    def generate_changelog(self, git_log: str) -> Dict[str, Any]:
-        system_prompt = """You are a professional technical writer who creates simple, easy-to-read changelogs.
+# Only fall back to .env when the API key isn't already in the environment
+if not os.getenv("ANTHROPIC_API_KEY"):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+logger = logging.getLogger("shipnote.ai")
+
+# Bump whenever the system prompt changes so cached changelogs are invalidated
+PROMPT_VERSION = 1
+
+SYSTEM_PROMPT = """You are a professional technical writer who creates simple, easy-to-read changelogs.
 
 Your task is to analyze git commits and create a changelog that anyone can understand:
 
@@ -110,19 +88,324 @@ Your task is to analyze git commits and create a changelog that anyone can under
 - Make it easy for anyone to understand
 - For deletions, clearly state what file or feature was removed"""
 
+# Commits the system prompt tells Claude to ignore anyway (merges, WIP,
+# version/dependency bumps); dropping them up front saves input tokens
+SKIP_COMMIT_RE = re.compile(r"^(merge |wip\b|bump |chore\(deps\))", re.IGNORECASE)
+
+
+# System prompt for the cheap "map" step on very large commit lists: Haiku
+# condenses each segment into short categorized entries, so Sonnet only
+# polishes a much smaller input into the final notes
+CLASSIFY_PROMPT = """You condense git commits into short changelog entries.
+
+Categories: Features, Fixes, Improvements, Deletions, Documentation, Other.
+
+Each commit starts with its number in square brackets; indented lines under a
+commit are the files it changed. Write one short entry per change in plain
+language, merging commits that make the same change. Each entry names the main
+file(s) changed and ends with " - by <author> (<date>)" from its commit.
+Merge commits, version bumps, "WIP" commits, trivial changes like "fix typo",
+and developer-only changes that don't affect users get no entry; list their
+numbers under "Skip".
+
+Reply with only a JSON object, e.g.
+{"Features": [{"text": "Added login page in `auth.py` - by John Doe (Nov 4, 10:00 AM)", "commits": [1, 3]}], "Skip": [2]}
+Every commit number must appear in an entry or in Skip. Leave out empty
+categories."""
+
+# Category order used when the condensed entries are handed to Sonnet
+CHANGELOG_CATEGORIES = ["Features", "Fixes", "Improvements", "Deletions", "Documentation", "Other"]
+
+
+class AIService:
+    def __init__(self):
+        self.api_key = os.getenv("ANTHROPIC_API_KEY")
+        
+        if not self.api_key:
+            raise ValueError(
+                "ANTHROPIC_API_KEY not found. "
+                "Please set it in your .env file or environment variables. "
+                "Get your API key from: https://console.anthropic.com/"
+            )
+        
+        # Created on first use (see the client property): importing anthropic
+        # pulls in httpx and pydantic, which slows down worker start-up
+        self._client = None
+        self.model = "claude-sonnet-4-20250514"
+
+        # Generated changelogs keyed by prompt content, so "regenerate" on the
+        # same commit range skips the Claude round-trip
+        self.notes_cache = LRUCache(maxsize=128)
+
+        # Logs over map_min_chars (several hundred commits) are split into
+        # segments that Haiku condenses in parallel (at most 8 calls in flight
+        # to respect rate limits), then Sonnet writes the notes from the merged
+        # entries in a single call. Smaller logs go straight to Sonnet: the
+        # extra round trip would cost more than it saves
+        self.haiku_model = "claude-3-5-haiku-20241022"
+        self.segment_size = 50
+        self.map_min_chars = 40000  # ~10k tokens
+        self.claude_slots = asyncio.Semaphore(8)
+    
+    @property
+    def client(self):
+        """The AsyncAnthropic client, created the first time it is needed"""
+        if self._client is None:
+            import anthropic
+            import httpx
+
+            # One pooled HTTP/2 client with long keepalive so back-to-back
+            # generations reuse the TLS session to api.anthropic.com
+            limits = httpx.Limits(max_keepalive_connections=32, max_connections=64, keepalive_expiry=120.0)
+            http_client = httpx.AsyncClient(limits=limits, http2=True)
+            self._client = anthropic.AsyncAnthropic(api_key=self.api_key, http_client=http_client)
+        return self._client
+
+    async def generate_release_notes(self, commits: list, from_ref: str = None, to_ref: str = 'HEAD') -> str:
+        """
+        Generate release notes from a list of commits.
+        This method is called by app.py endpoints.
+        
+        Args:
+            commits: List of commit dictionaries with hash, message, author, date
+            from_ref: Starting reference (optional)
+            to_ref: Ending reference
+            
+        Returns:
+            Markdown-formatted release notes as a string
+        """
+        commits = self._trim_commits(commits)
+        git_log = self._build_git_log(commits, from_ref, to_ref)
+
+        cache_key = self._cache_key(git_log)
+        cached = self.notes_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        if self._needs_map(commits, git_log):
+            prompt_log = await self._build_classified_log(commits, from_ref, to_ref)
+        else:
+            prompt_log = git_log
+
+        result = await self.generate_changelog(prompt_log)
+        if not result['success']:
+            return ''
+        self.notes_cache.set(cache_key, result['changelog'])
+        return result['changelog']
+
+    async def stream_release_notes(self, commits: list, from_ref: str = None, to_ref: str = 'HEAD') -> AsyncIterator[str]:
+        """
+        Same as generate_release_notes, but yields the notes piece by piece
+        as Claude writes them so the client sees output immediately.
+
+        Cache hits are yielded as a single chunk; a fully streamed result
+        is stored in the cache for later calls.
+        """
+        commits = self._trim_commits(commits)
+        git_log = self._build_git_log(commits, from_ref, to_ref)
+
+        cache_key = self._cache_key(git_log)
+        cached = self.notes_cache.get(cache_key)
+        if cached is not None:
+            yield cached
+            return
+
+        if self._needs_map(commits, git_log):
+            prompt_log = await self._build_classified_log(commits, from_ref, to_ref)
+        else:
+            prompt_log = git_log
+
+        parts = []
+        async for text in self.stream_changelog(prompt_log):
+            parts.append(text)
+            yield text
+        self.notes_cache.set(cache_key, "".join(parts))
+
+    def _trim_commits(self, commits: list) -> list:
+        """
+        Drop noise commits and cut every message down to its subject line
+        before the commits are sent to Claude. If every commit is noise the
+        list is kept as-is so Claude still has something to summarize.
+        """
+        kept = [
+            {**commit, "message": commit['message'].split("\n", 1)[0]}
+            for commit in commits
+            if not SKIP_COMMIT_RE.match(commit['message'])
+        ]
+        if not kept:
+            return commits
+
+        skipped = len(commits) - len(kept)
+        if skipped:
+            logger.info("Skipped %d of %d commits (merges, WIP, version bumps)", skipped, len(commits))
+        return kept
+
+    def _needs_map(self, commits: list, git_log: str) -> bool:
+        """Whether the log is big enough for the Haiku map step to pay off"""
+        return len(commits) > self.segment_size and len(git_log) > self.map_min_chars
+
+    async def _build_classified_log(self, commits: list, from_ref: str = None, to_ref: str = 'HEAD') -> str:
+        """
+        Map step for very large commit lists: condense segments of commits
+        into categorized changelog entries with Haiku concurrently, then merge
+        them (in order) into one short log for Sonnet to polish.
+
+        Segments are whole commits, so file lines stay with their commit.
+        Commits from a segment that could not be condensed, or that Haiku
+        left out, are passed through unchanged in a "Not categorized" section.
+        """
+        segments = [commits[i:i + self.segment_size] for i in range(0, len(commits), self.segment_size)]
+        results = await asyncio.gather(*[self._classify_segment(segment) for segment in segments])
+
+        categories = {name: [] for name in CHANGELOG_CATEGORIES}
+        uncategorized = []
+        skipped = []
+        for segment, result in zip(segments, results):
+            if result is None:
+                uncategorized.extend(segment)
+                continue
+            placed = set()
+            for name in CHANGELOG_CATEGORIES:
+                for entry in result.get(name, []):
+                    categories[name].append(entry["text"])
+                    placed.update(entry["commits"])
+            for number in result.get("Skip", []):
+                if number not in placed:
+                    placed.add(number)
+                    skipped.append(segment[number - 1])
+            uncategorized.extend(commit for number, commit in enumerate(segment, 1) if number not in placed)
+
+        if skipped:
+            logger.info("Classifier skipped %d commits as noise: %s",
+                        len(skipped), ", ".join(commit['hash'] for commit in skipped))
+
+        sections = [
+            f"{name}:\n" + "\n".join(f"- {text}" for text in entries)
+            for name, entries in categories.items() if entries
+        ]
+        if uncategorized:
+            sections.append("Not categorized (sort these yourself):\n" + self._format_commits(uncategorized))
+        return (f"Commits from {from_ref or 'start'} to {to_ref}, already condensed into changelog entries:\n\n"
+                + "\n\n".join(sections))
+
+    async def _classify_segment(self, commits: list) -> Optional[Dict[str, list]]:
+        """
+        Ask Haiku to condense one segment of commits into changelog entries.
+        Returns {category: [{"text", "commits"}], "Skip": [commit numbers]}
+        with 1-based commit numbers, or None if the call fails or the reply
+        isn't valid.
+        """
+        import anthropic
+
+        numbered = "\n".join(f"[{number}] {self._format_commit(commit)}" for number, commit in enumerate(commits, 1))
         try:
-            message = self.client.messages.create(
-                model="claude-sonnet-4-20250514",
-                max_tokens=4000,
-                temperature=0.3,
-                system=system_prompt,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": f"Here is the git log to convert into a changelog:\n\n{git_log}"
-                    }
-                ]
+            async with self.claude_slots:
+                message = await self.client.messages.create(
+                    model=self.haiku_model,
+                    max_tokens=4000,
+                    temperature=0,
+                    system=CLASSIFY_PROMPT,
+                    messages=[{"role": "user", "content": numbered}]
+                )
+        except anthropic.APIError as e:
+            logger.warning("Commit condensing failed, sending segment uncategorized: %s", e)
+            return None
+
+        reply = "".join(block.text for block in message.content if getattr(block, "type", None) == "text")
+        result = self._parse_classification(reply, len(commits))
+        if result is None:
+            logger.warning("Unusable condensed entries, sending segment uncategorized: %r", reply[:200])
+        return result
+
+    @staticmethod
+    def _parse_classification(reply: str, commit_count: int) -> Optional[Dict[str, list]]:
+        """
+        Validate Haiku's reply: a JSON object (possibly wrapped in a code fence
+        or a sentence) mapping known category names to lists of
+        {"text": str, "commits": [numbers]} entries, and "Skip" to a list of
+        numbers. Commit numbers must be between 1 and commit_count.
+        Unknown category names are ignored.
+        """
+        def valid_numbers(numbers: Any) -> bool:
+            return isinstance(numbers, list) and all(
+                isinstance(number, int) and not isinstance(number, bool) and 1 <= number <= commit_count
+                for number in numbers
             )
+
+        try:
+            result = json.loads(reply[reply.find('{'):reply.rfind('}') + 1])
+        except ValueError:
+            return None
+        if not isinstance(result, dict):
+            return None
+
+        classification = {}
+        for name, value in result.items():
+            if name == "Skip":
+                if not valid_numbers(value):
+                    return None
+            elif name in CHANGELOG_CATEGORIES:
+                if not isinstance(value, list) or not all(
+                    isinstance(entry, dict) and isinstance(entry.get("text"), str) and entry["text"].strip()
+                    and valid_numbers(entry.get("commits"))
+                    for entry in value
+                ):
+                    return None
+            else:
+                continue
+            classification[name] = value
+        return classification
+
+    def _build_git_log(self, commits: list, from_ref: str = None, to_ref: str = 'HEAD') -> str:
+        """Format commits into the readable text that is sent to Claude"""
+        return f"Commits from {from_ref or 'start'} to {to_ref}:\n\n{self._format_commits(commits)}"
+
+    def _format_commits(self, commits: list) -> str:
+        """
+        One "- message - by author (date)" line per commit, followed by its
+        indented file-status lines when the commit has "files"
+        """
+        return "\n".join(self._format_commit(commit) for commit in commits)
+
+    def _format_commit(self, commit: dict) -> str:
+        line = f"- {commit['message']} - by {commit.get('author', 'Unknown')} ({commit['date']})"
+        files = commit.get('files')
+        if not files:
+            return line
+        return line + "".join(f"\n    {file_line}" for file_line in files)
+
+    def _cache_key(self, git_log: str) -> str:
+        """Stable hash of everything that determines Claude's output"""
+        payload = json.dumps({
+            "log": git_log,
+            "prompt_v": PROMPT_VERSION,
+            "model": self.model
+        }, sort_keys=True)
+        return hashlib.blake2b(payload.encode('utf-8')).hexdigest()
+        
+    def _message_params(self, git_log: str) -> Dict[str, Any]:
+        """Request parameters shared by the buffered and streaming Claude calls"""
+        return {
+            "model": self.model,
+            "max_tokens": 4000,
+            "temperature": 0.3,
+            # Not marked for prompt caching: SYSTEM_PROMPT (~700 tokens) is below
+            # the 1024-token minimum cacheable prefix for Sonnet, so
+            # cache_control would have no effect
+            "system": SYSTEM_PROMPT,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": f"Here is the git log to convert into a changelog:\n\n{git_log}"
+                }
+            ]
+        }
+
+    async def generate_changelog(self, git_log: str) -> Dict[str, Any]:
+        import anthropic
+
+        try:
+            message = await self.client.messages.create(**self._message_params(git_log))
             
             changelog = message.content[0].text
             total_tokens = message.usage.input_tokens + message.usage.output_tokens
@@ -164,6 +447,15 @@ Your task is to analyze git commits and create a changelog that anyone can under
                 "tokens_used": 0
             }
 
+    async def stream_changelog(self, git_log: str) -> AsyncIterator[str]:
+        """
+        Stream the changelog text from Claude as it is generated.
+        API errors are raised to the caller, which reports them to the client.
+        """
+        async with self.client.messages.stream(**self._message_params(git_log)) as stream:
+            async for text in stream.text_stream:
+                yield text
+
 if __name__ == "__main__":
     service = AIService()
     
@@ -185,5 +477,5 @@ Date:   Sat Nov 8 15:11:56 2025 -0700
 A       cli/new_feature.py
 """
     
-    result = service.generate_changelog(sample_log)
+    result = asyncio.run(service.generate_changelog(sample_log))
     print(result["changelog"] if result["success"] else result["error"])
@@ -5,16 +5,26 @@ This service handles all Git repository operations.
 It reads commit history from local Git repositories.
 """
 
-from git import Repo
-from datetime import datetime
+import subprocess
+import time
 from typing import List, Dict, Optional
 
+from .cache import LRUCache
+
+# Commit date format, e.g. "Nov 08, 03:24 PM"
+DATE_FORMAT = '%b %d, %I:%M %p'
+
 
 class GitService:
     """
     Service for interacting with Git repositories.
-    Uses GitPython library to read commit history.
+    Runs `git log` directly to read commit history.
     """
+
+    def __init__(self):
+        # Commit lists keyed by the commits the refs currently point to, so
+        # repeat requests for an unchanged range skip `git log` entirely
+        self.commits_cache = LRUCache(maxsize=64)
     
     def get_commits(self, repo_path: str, from_ref: Optional[str] = None, to_ref: str = 'HEAD', limit: int = 50) -> List[Dict]:
         """
@@ -32,25 +42,64 @@ class GitService:
             commits = git_service.get_commits("/path/to/repo", "v1.0.0", "HEAD")
         """
         try:
-            repo = Repo(repo_path)
             if from_ref:
                 commit_range = f"{from_ref}..{to_ref}"
             else:
                 commit_range = to_ref
+            refs = [to_ref, from_ref] if from_ref else [to_ref]
+            cache_key = (repo_path, from_ref, to_ref, self._resolve_refs(repo_path, refs), limit)
+            cached = self.commits_cache.get(cache_key)
+            if cached is not None:
+                return list(cached)
+
+            # One `git log --numstat` process for the whole range, read as raw
+            # bytes. Records start with \x1e and fields are separated by \x1f;
+            # the numstat lines (one per changed file) follow the last field.
+            # Merges are diffed against their first parent and renames count
+            # as a delete plus an add, matching GitPython's commit.stats.
+            proc = subprocess.run(
+                [
+                    "git", "-C", repo_path, "log",
+                    f"--max-count={limit}",
+                    "--numstat", "--diff-merges=first-parent", "--no-renames",
+                    "--pretty=format:%x1e%H%x1f%an%x1f%ct%x1f%B%x1f",
+                    # Refs come from the request, never let them be read as options
+                    "--end-of-options", commit_range, "--"
+                ],
+                capture_output=True
+            )
+            if proc.returncode != 0:
+                raise Exception(proc.stderr.decode('utf-8', errors='replace').strip())
+
             commits = []
-            for commit in repo.iter_commits(commit_range, max_count=limit):
-                commit_date = datetime.fromtimestamp(commit.committed_date).strftime('%b %d, %I:%M %p')
+            for record in proc.stdout.split(b'\x1e')[1:]:
+                hexsha, author, committed_date, message, numstat = record.split(b'\x1f', 4)
+                commit_date = time.strftime(DATE_FORMAT, time.localtime(int(committed_date)))
                 commits.append({
-                    "hash": commit.hexsha[:7],
-                    "message": commit.message.strip(),
-                    "author": commit.author.name,
+                    "hash": hexsha[:7].decode('ascii'),
+                    "message": message.decode('utf-8', errors='replace').strip(),
+                    "author": author.decode('utf-8', errors='replace'),
                     "date": commit_date,
-                    "files_changed": len(commit.stats.files)
+                    "files_changed": sum(1 for line in numstat.splitlines() if line.strip())
                 })
-            return commits
+            self.commits_cache.set(cache_key, commits)
+            return list(commits)
         except Exception as e:
             raise Exception(f"Failed to fetch commits from {repo_path}: {str(e)}")
 
+    def _resolve_refs(self, repo_path: str, refs: List[str]) -> tuple:
+        """Full commit SHAs that the given refs point to right now (in the same order)"""
+        proc = subprocess.run(
+            [
+                "git", "-C", repo_path, "log", "--no-walk=unsorted", "--format=%H",
+                "--end-of-options", *refs, "--"
+            ],
+            capture_output=True
+        )
+        if proc.returncode != 0:
+            raise Exception(proc.stderr.decode('utf-8', errors='replace').strip())
+        return tuple(proc.stdout.decode('ascii').split())
+
 # Test code (only runs when you execute this file directly)
 if __name__ == "__main__":
     print("Testing GitService...")
@@ -3,25 +3,120 @@ GitHub Service for ShipNote
 Handles GitHub API interactions including OAuth and repository operations
 """
 
-import requests
+import asyncio
+import hashlib
+import json
+import logging
 import os
-from typing import Dict, List, Any, Optional
-from dotenv import load_dotenv
+import re
+import time
+from typing import Callable, Dict, List, Any, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+import httpx
+import orjson
 
-load_dotenv()
+from .cache import LRUCache
+
+# Look for a .env file only when the environment does not already provide
+# the credentials (production injects them, so no filesystem walk there)
+if not os.getenv("GITHUB_CLIENT_ID"):
+    from dotenv import load_dotenv
+    load_dotenv()
+
+logger = logging.getLogger("shipnote.github")
+
+
+# Retry policy for rate limits and server errors
+MAX_RETRIES = 3
+RETRY_BACKOFF = 0.3  # Seconds, doubled on each attempt
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Resolved once at import rather than on every GitHubService()
+_CLIENT_ID = os.getenv("GITHUB_CLIENT_ID")
+_CLIENT_SECRET = os.getenv("GITHUB_CLIENT_SECRET")
+_API_BASE = "https://api.github.com"
+OAUTH_TOKEN_URL = "https://github.com/login/oauth/access_token"
+
+if not _CLIENT_ID or not _CLIENT_SECRET:
+    logger.warning("GitHub OAuth credentials not configured. "
+                   "Set GITHUB_CLIENT_ID and GITHUB_CLIENT_SECRET in .env file")
+
+
+def _loads(response: Any) -> Any:
+    """Decode a JSON response body with orjson, falling back to the stdlib parser"""
+    try:
+        return orjson.loads(response.content)
+    except orjson.JSONDecodeError:
+        # e.g. a body in a non-UTF-8 charset that httpx can still decode
+        return json.loads(response.text)
+
+
+def _author(commit: dict) -> str:
+    """
+    Author name for a GitHub commit payload: the login of the linked GitHub
+    user, then the git author name, then the committer name, falling back
+    through short-circuit `or`s. Plain dict annotations keep it compilable
+    with mypyc.
+    """
+    commit_obj: dict = commit.get("commit") or {}
+    return ((commit.get("author") or {}).get("login")
+            or (commit_obj.get("author") or {}).get("name")
+            or (commit_obj.get("committer") or {}).get("name")
+            or "Unknown")
+
+
+NEGATIVE_CACHE_TTL = 60  # Seconds a 403/404 is replayed without asking GitHub
+
+# https://github.com/owner/repo[.git][/tree/...], github.com/owner/repo,
+# git@github.com:owner/repo.git -- repo names may contain dots (next.js)
+GITHUB_URL_RE = re.compile(r'github\.com[/:]([^/\s]+)/([^/\s#?]+?)(?:\.git)?(?:[/#?].*)?$')
 
 
 class GitHubService:
-    def __init__(self):
-        self.client_id = os.getenv("GITHUB_CLIENT_ID")
-        self.client_secret = os.getenv("GITHUB_CLIENT_SECRET")
-        self.api_base = "https://api.github.com"
-        
-        if not self.client_id or not self.client_secret:
-            print("WARNING: GitHub OAuth credentials not configured")
-            print("Set GITHUB_CLIENT_ID and GITHUB_CLIENT_SECRET in .env file")
+    """
+    GitHub OAuth and REST API client for the Quart routes.
+
+    All requests go through one pooled httpx.AsyncClient speaking HTTP/2, so
+    the pages of a commit or repository listing are fetched concurrently
+    (asyncio.gather) as streams over a kept-alive connection.
+    """
+
+    def __init__(self, transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.client_id = _CLIENT_ID
+        self.client_secret = _CLIENT_SECRET
+        self.api_base = _API_BASE
+        # Conditional-request cache: (url, params, token hash) ->
+        # {"etag", "data", "link"} for 200s, {"response", "until"} for failures.
+        # "data" holds the reduced entries, never the full GitHub payload
+        self.response_cache = LRUCache(128)
+        # Created on first use, inside the event loop that serves requests
+        self._client = None
+        self._transport = transport  # Overridden in tests (httpx.MockTransport)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The shared httpx.AsyncClient, created the first time it is needed"""
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=True,
+                # Pool for the whole worker (api.github.com and github.com),
+                # so concurrent user requests are not queued behind each other
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=32),
+                headers={"Accept": "application/vnd.github+json"},
+                # GitHub answers 301 for renamed and transferred repositories
+                follow_redirects=True,
+                timeout=30.0,
+                transport=self._transport
+            )
+        return self._client
+
+    async def aclose(self) -> None:
+        """Close the HTTP client (called when the server shuts down)"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
     
-    def exchange_code_for_token(self, code: str) -> Dict[str, Any]:
+    async def exchange_code_for_token(self, code: str) -> Dict[str, Any]:
         """
         Exchange OAuth code for access token
         
@@ -31,7 +126,6 @@ class GitHubService:
         Returns:
             Dict with access_token and token_type
         """
-        url = "https://github.com/login/oauth/access_token"
         headers = {"Accept": "application/json"}
         data = {
             "client_id": self.client_id,
@@ -40,9 +134,9 @@ class GitHubService:
         }
         
         try:
-            response = requests.post(url, headers=headers, data=data)
+            response = await self.client.post(OAUTH_TOKEN_URL, headers=headers, data=data)
             response.raise_for_status()
-            result = response.json()
+            result = _loads(response)
             
             if "access_token" in result:
                 return {
@@ -61,7 +155,7 @@ class GitHubService:
                 "error": str(e)
             }
     
-    def get_user_info(self, access_token: str) -> Dict[str, Any]:
+    async def get_user_info(self, access_token: str) -> Dict[str, Any]:
         """
         Get authenticated user's information
         
@@ -71,67 +165,40 @@ class GitHubService:
         Returns:
             Dict with user information
         """
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+        headers = {"Authorization": f"Bearer {access_token}"}
         
         try:
-            response = requests.get(f"{self.api_base}/user", headers=headers)
-            response.raise_for_status()
-            user_data = response.json()
+            user_info, _ = await self._get_json(f"{self.api_base}/user", headers, transform=self._user_entry)
             
-            return {
-                "success": True,
-                "username": user_data.get("login"),
-                "name": user_data.get("name"),
-                "avatar_url": user_data.get("avatar_url"),
-                "email": user_data.get("email")
-            }
+            return {"success": True, **user_info}
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e)
             }
     
-    def get_user_repositories(self, access_token: str, per_page: int = 30) -> Dict[str, Any]:
+    async def get_user_repositories(self, access_token: str, per_page: int = 100, max_pages: int = 10) -> Dict[str, Any]:
         """
         Get user's repositories
         
         Args:
             access_token: GitHub access token
             per_page: Number of repos per page
+            max_pages: Maximum number of pages to fetch
             
         Returns:
             Dict with list of repositories
         """
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+        headers = {"Authorization": f"Bearer {access_token}"}
         
         try:
-            response = requests.get(
+            repositories = await self._get_pages(
                 f"{self.api_base}/user/repos",
-                headers=headers,
-                params={"per_page": per_page, "sort": "updated"}
+                headers,
+                {"per_page": per_page, "sort": "updated"},
+                max_pages,
+                transform=lambda page: [self._repo_entry(repo) for repo in page]
             )
-            response.raise_for_status()
-            repos_data = response.json()
-            
-            repositories = []
-            for repo in repos_data:
-                repositories.append({
-                    "id": repo["id"],
-                    "name": repo["name"],
-                    "full_name": repo["full_name"],
-                    "description": repo.get("description", ""),
-                    "private": repo["private"],
-                    "url": repo["html_url"],
-                    "clone_url": repo["clone_url"],
-                    "stars": repo["stargazers_count"],
-                    "updated_at": repo["updated_at"]
-                })
             
             return {
                 "success": True,
@@ -143,9 +210,9 @@ class GitHubService:
                 "error": str(e)
             }
     
-    def fetch_repo_commits(self, access_token: str, owner: str, repo: str, 
-                          since: Optional[str] = None, until: Optional[str] = None,
-                          limit: int = 100) -> Dict[str, Any]:
+    async def fetch_repo_commits(self, access_token: str, owner: str, repo: str, 
+                                 since: Optional[str] = None, until: Optional[str] = None,
+                                 limit: int = 100) -> Dict[str, Any]:
         """
         Fetch commits from a GitHub repository
         
@@ -160,78 +227,200 @@ class GitHubService:
         Returns:
             Dict with list of commits
         """
-        headers = {
-            "Authorization": f"Bearer {access_token}",
-            "Accept": "application/vnd.github.v3+json"
-        }
+        headers = {"Authorization": f"Bearer {access_token}"}
         
-        params = {"per_page": min(limit, 100)}
+        per_page = min(limit, 100)
+        params = {"per_page": per_page}
         if since:
             params["since"] = since
         if until:
             params["until"] = until
         
         try:
-            response = requests.get(
+            commits = await self._get_pages(
                 f"{self.api_base}/repos/{owner}/{repo}/commits",
-                headers=headers,
-                params=params
+                headers,
+                params,
+                max_pages=-(-limit // per_page),  # Ceiling division
+                transform=lambda page: [self._commit_entry(commit) for commit in page]
             )
-            response.raise_for_status()
-            commits_data = response.json()
-            
-            commits = []
-            for commit in commits_data:
-                commit_obj = commit.get("commit", {})
-                
-                # Try to get author name from multiple sources
-                author_name = "Unknown"
-                
-                # First try: GitHub user (authenticated author)
-                if commit.get("author") and commit["author"].get("login"):
-                    author_name = commit["author"]["login"]
-                # Second try: Git commit author name
-                elif commit_obj.get("author") and commit_obj["author"].get("name"):
-                    author_name = commit_obj["author"]["name"]
-                # Third try: Committer if author not available
-                elif commit_obj.get("committer") and commit_obj["committer"].get("name"):
-                    author_name = commit_obj["committer"]["name"]
-                
-                commits.append({
-                    "hash": commit["sha"][:7],  # Short hash
-                    "message": commit_obj.get("message", ""),
-                    "author": author_name,
-                    "date": commit_obj.get("author", {}).get("date", ""),
-                    "url": commit.get("html_url", "")
-                })
-            
-            return {
-                "success": True,
-                "commits": commits,
-                "count": len(commits)
-            }
-        except requests.exceptions.HTTPError as e:
-            if e.response.status_code == 404:
-                return {
-                    "success": False,
-                    "error": "Repository not found or you don't have access"
-                }
-            elif e.response.status_code == 403:
-                return {
-                    "success": False,
-                    "error": "Access forbidden. Check your permissions."
-                }
-            else:
-                return {
-                    "success": False,
-                    "error": f"GitHub API error: {str(e)}"
-                }
+            return self._commits_result(commits[:limit])
+        except httpx.HTTPStatusError as e:
+            return self._commits_error(e.response, e)
         except Exception as e:
             return {
                 "success": False,
                 "error": str(e)
             }
     
+    @staticmethod
+    def _commits_result(commits: List[Dict[str, str]]) -> Dict[str, Any]:
+        return {
+            "success": True,
+            "commits": commits,
+            "count": len(commits)
+        }
+    
+    @staticmethod
+    def _user_entry(user: Dict[str, Any]) -> Dict[str, Any]:
+        """The authenticated user from the GitHub API, reduced to the fields the app uses"""
+        return {
+            "username": user.get("login"),
+            "name": user.get("name"),
+            "avatar_url": user.get("avatar_url"),
+            "email": user.get("email")
+        }
+    
+    @staticmethod
+    def _repo_entry(repo: Dict[str, Any]) -> Dict[str, Any]:
+        """One repository from the GitHub API, reduced to the fields the app uses"""
+        return {
+            "id": repo["id"],
+            "name": repo["name"],
+            "full_name": repo["full_name"],
+            "description": repo.get("description", ""),
+            "private": repo["private"],
+            "url": repo["html_url"],
+            "clone_url": repo["clone_url"],
+            "stars": repo["stargazers_count"],
+            "updated_at": repo["updated_at"]
+        }
+    
+    @staticmethod
+    def _commit_entry(commit: Dict[str, Any]) -> Dict[str, str]:
+        """One commit from the GitHub API, reduced to the fields the app uses"""
+        commit_obj = commit.get("commit") or {}
+        return {
+            "hash": commit["sha"][:7],  # Short hash
+            "message": commit_obj.get("message", ""),
+            "author": _author(commit),
+            "date": (commit_obj.get("author") or {}).get("date", ""),
+            "url": commit.get("html_url", "")
+        }
+    
+    @staticmethod
+    def _commits_error(response: httpx.Response, error: Exception) -> Dict[str, Any]:
+        """
+        Result for an HTTP error status from the commits endpoint. The error
+        body is never JSON-decoded; only its start is logged.
+        """
+        status_code = response.status_code
+        logger.warning("GitHub commits request failed (%s): %s", status_code, response.text[:200])
+        if status_code == 404:
+            return {
+                "success": False,
+                "error": "Repository not found or you don't have access"
+            }
+        elif status_code == 403:
+            return {
+                "success": False,
+                "error": "Access forbidden. Check your permissions."
+            }
+        else:
+            return {
+                "success": False,
+                "error": f"GitHub API error: {str(error)}"
+            }
+    
+    async def _get_pages(self, url: str, headers: Dict[str, str], params: Dict[str, Any], max_pages: int,
+                         transform: Optional[Callable[[Any], List[Any]]] = None) -> List[Any]:
+        """
+        GET a paginated GitHub list endpoint and return the items of all pages,
+        each page passed through transform (see _get_json).
+
+        Page 1 is fetched first to learn the last page number from the Link
+        header; the remaining pages (up to max_pages) are then requested
+        concurrently and joined in page order.
+        Raises httpx.HTTPStatusError like a single raise_for_status() call.
+        """
+        first_page, response = await self._get_json(url, headers, params, transform)
+
+        last_page = min(self._last_page(response), max_pages)
+        if last_page <= 1:
+            return first_page
+
+        # Close to the rate limit: fetch the remaining pages one at a time
+        if int(response.headers.get("X-RateLimit-Remaining", 1000)) < 10:
+            pages = [(await self._get_json(url, headers, {**params, "page": page}, transform))[0]
+                     for page in range(2, last_page + 1)]
+        else:
+            results = await asyncio.gather(*(
+                self._get_json(url, headers, {**params, "page": page}, transform)
+                for page in range(2, last_page + 1)
+            ))
+            pages = [page_items for page_items, _ in results]
+
+        items = list(first_page)  # Copy: the cached page 1 must not grow
+        for page_items in pages:
+            items.extend(page_items)
+        return items
+
+    async def _get_json(self, url: str, headers: Dict[str, str],
+                        params: Optional[Dict[str, Any]] = None,
+                        transform: Optional[Callable[[Any], Any]] = None) -> Tuple[Any, httpx.Response]:
+        """
+        GET a GitHub API URL and return (parsed body, response).
+
+        transform reduces the parsed body to what the caller keeps; its result
+        is what gets cached and returned, so the full payload is not held in memory.
+
+        Sends If-None-Match with the ETag of the last 200 for the same URL,
+        params and token; a 304 (free against the rate limit) is answered from
+        the cached body. 403/404 responses are replayed for NEGATIVE_CACHE_TTL
+        seconds, or until X-RateLimit-Reset when the rate limit is exhausted.
+        Rate limits and server errors are retried with backoff.
+        Raises httpx.HTTPStatusError like raise_for_status().
+        """
+        token_hash = hashlib.blake2b(headers.get("Authorization", "").encode("utf-8")).hexdigest()
+        key = (url, tuple(sorted((params or {}).items())), token_hash)
+        cached = self.response_cache.get(key)
+
+        if cached and "until" in cached:
+            if time.time() < cached["until"]:
+                cached["response"].raise_for_status()
+            cached = None
+
+        request_headers = dict(headers)
+        if cached:
+            request_headers["If-None-Match"] = cached["etag"]
+
+        for attempt in range(MAX_RETRIES + 1):
+            response = await self.client.get(url, headers=request_headers, params=params)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                break
+            retry_after = response.headers.get("Retry-After")
+            await asyncio.sleep(float(retry_after) if retry_after and retry_after.isdigit()
+                                else RETRY_BACKOFF * 2 ** attempt)
+
+        if response.status_code == 304 and cached:
+            # 304s may omit the Link header that pagination relies on
+            if cached["link"] and "Link" not in response.headers:
+                response.headers["Link"] = cached["link"]
+            return cached["data"], response
+
+        if response.status_code in (403, 404):
+            until = time.time() + NEGATIVE_CACHE_TTL
+            if response.headers.get("X-RateLimit-Remaining") == "0":
+                until = float(response.headers.get("X-RateLimit-Reset", until))
+            self.response_cache.set(key, {"response": response, "until": until})
+        response.raise_for_status()
+
+        data = _loads(response)
+        if transform is not None:
+            data = transform(data)
+        etag = response.headers.get("ETag")
+        if etag:
+            self.response_cache.set(key, {"etag": etag, "data": data, "link": response.headers.get("Link")})
+        return data, response
+
+    @staticmethod
+    def _last_page(response: httpx.Response) -> int:
+        """Last page number from GitHub's Link header (1 if there is only one page)"""
+        last_url = response.links.get("last", {}).get("url")
+        if not last_url:
+            return 1
+        return int(parse_qs(urlparse(last_url).query).get("page", ["1"])[0])
+
     def parse_github_url(self, url: str) -> Optional[Dict[str, str]]:
         """
         Parse GitHub repository URL to extract owner and repo name
@@ -242,29 +431,15 @@ class GitHubService:
         Returns:
             Dict with owner and repo, or None if invalid
         """
-        # Remove trailing slashes and .git
-        url = url.rstrip('/').replace('.git', '')
-        
-        # Handle different GitHub URL formats
-        # https://github.com/owner/repo
-        # github.com/owner/repo
-        # git@github.com:owner/repo
-        
-        if 'github.com' not in url:
-            return None
-        
-        # Extract the path after github.com
-        if 'github.com/' in url:
-            parts = url.split('github.com/')[-1].split('/')
-        elif 'github.com:' in url:
-            parts = url.split('github.com:')[-1].split('/')
-        else:
+        match = GITHUB_URL_RE.search(url)
+        if not match:
             return None
-        
-        if len(parts) >= 2:
-            return {
-                "owner": parts[0],
-                "repo": parts[1]
-            }
-        
-        return None
+        return {
+            "owner": match.group(1),
+            "repo": match.group(2)
+        }
+
+
+
+# Shared instance used by the app
+github_service = GitHubService()
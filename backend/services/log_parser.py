@@ -0,0 +1,65 @@
+"""
+Log Parser
+==========
+Turns git log text sent to /api/generate-from-text into commit objects:
+the CLI's `git log --name-status` output, or pasted "<hash> <message>" lines.
+"""
+
+import re
+
+# One pasted git log line: "<hash> <message>", surrounding (Unicode) whitespace
+# ignored like str.strip(). Lines without a space only match group 1 and become
+# the message themselves.
+GIT_LOG_LINE_RE = re.compile(r'^[^\S\n]*(\S[^ \n]*?)(?: (.*?))?[^\S\n]*$', re.MULTILINE)
+
+
+# Commit header line of the CLI's `git log --pretty=format:%h|%cd|%an|%s --name-status`
+# output; the file-status lines ("M\tpath") that follow belong to that commit
+CLI_COMMIT_LINE_RE = re.compile(r'^[0-9a-f]{7,}\|', re.MULTILINE)
+
+
+def parse_cli_log(git_log_text):
+    """
+    Parse the CLI's git log output into one commit object per header line,
+    with the commit's file-status lines in "files".
+    """
+    commits = []
+    for line in git_log_text.split('\n'):
+        line = line.strip()
+        if not line:
+            continue
+        if CLI_COMMIT_LINE_RE.match(line):
+            hash_val, date, author, message = (line.split('|', 3) + ['', '', ''])[:4]
+            commits.append({
+                "hash": hash_val,
+                "message": message,
+                "author": author or "Unknown",
+                "date": date,
+                "files": []
+            })
+        elif commits:
+            commits[-1]["files"].append(line)
+    return commits
+
+
+def parse_pasted_log(git_log_text):
+    """
+    Parse pasted git log text into commit objects.
+    Each line is assumed to be: <hash> <message>
+    If no hash is detected, the entire line is treated as the message and
+    gets a "commit-<line number>" placeholder hash.
+    """
+    commits = []
+    # Line numbers count from the first non-blank line, as the placeholders always have
+    line_no = -git_log_text[:len(git_log_text) - len(git_log_text.lstrip())].count('\n')
+    pos = 0
+    for match in GIT_LOG_LINE_RE.finditer(git_log_text):
+        line_no += git_log_text.count('\n', pos, match.start())
+        pos = match.start()
+        commits.append({
+            "hash": match.group(1) if match.group(2) else f"commit-{line_no}",
+            "message": match.group(2) or match.group(1),
+            "author": "Unknown",
+            "date": ""
+        })
+    return commits
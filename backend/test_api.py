@@ -7,10 +7,15 @@ This script tests all the main endpoints of your ShipNote backend.
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import json
 
 BASE_URL = "http://localhost:5000"
 
+# One session for every test request so the connection to the server is reused
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_maxsize=8))
+
 def print_header(text):
     """Print a formatted header"""
     print("\n" + "="*70)
@@ -27,7 +32,7 @@ def test_health():
     print_subheader("Testing Health Endpoint")
     
     try:
-        response = requests.get(f"{BASE_URL}/health")
+        response = _SESSION.get(f"{BASE_URL}/health")
         print(f"Status Code: {response.status_code}")
         print(f"Response: {json.dumps(response.json(), indent=2)}")
         
@@ -63,7 +68,7 @@ i9j5m6o fix(api): handle null values in user profile endpoint"""
     print(f"Sending {len(sample_git_log.split(chr(10)))} commits to API...")
     
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{BASE_URL}/api/generate-from-text",
             json=payload,
             timeout=30  # Give Claude time to respond
@@ -135,7 +140,7 @@ def test_generate_notes_structured():
     print(f"Sending {len(commits)} structured commits...")
     
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{BASE_URL}/api/generate-notes",
             json=payload,
             timeout=30
@@ -169,7 +174,7 @@ def test_error_handling():
     # Test with empty git log
     print("\n1. Testing with empty git log...")
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{BASE_URL}/api/generate-from-text",
             json={"git_log_text": ""},
             timeout=10
@@ -185,7 +190,7 @@ def test_error_handling():
     # Test with no commits
     print("\n2. Testing with missing commits...")
     try:
-        response = requests.post(
+        response = _SESSION.post(
             f"{BASE_URL}/api/generate-notes",
             json={"commits": []},
             timeout=10
@@ -0,0 +1,60 @@
+"""
+Tests for the Haiku map step of AIService with a stubbed Anthropic client
+"""
+
+import asyncio
+import json
+import os
+import sys
+import types
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.ai_service import AIService
+
+
+def reply(text):
+    return types.SimpleNamespace(content=[types.SimpleNamespace(type="text", text=text)])
+
+
+def test_condensed_entries_replace_commits_and_omitted_commits_are_kept(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    service = AIService()
+    service.segment_size = 3
+    replies = iter([
+        '```json\n{"Features": [{"text": "Added login in `auth.py` - by a (d)", "commits": [1, 2]}], "Skip": [2]}\n```',
+        '{"Fixes": [1]}',  # Not entries: the whole segment stays uncategorized
+    ])
+
+    async def create(**kwargs):
+        return reply(next(replies))
+
+    service._client = types.SimpleNamespace(messages=types.SimpleNamespace(create=create))
+    commits = [{"hash": f"h{i}", "message": f"m{i}", "author": "a", "date": "d", "files": [f"M\tf{i}.py"]}
+               for i in range(1, 6)]
+
+    log = asyncio.run(service._build_classified_log(commits))
+
+    assert log == (
+        "Commits from start to HEAD, already condensed into changelog entries:\n\n"
+        "Features:\n"
+        "- Added login in `auth.py` - by a (d)\n\n"
+        "Not categorized (sort these yourself):\n"
+        "- m3 - by a (d)\n    M\tf3.py\n"
+        "- m4 - by a (d)\n    M\tf4.py\n"
+        "- m5 - by a (d)\n    M\tf5.py"
+    )
+
+
+def test_small_logs_skip_the_map_step(monkeypatch):
+    monkeypatch.setenv("ANTHROPIC_API_KEY", "test")
+    service = AIService()
+    commits = [{"hash": f"h{i}", "message": f"m{i}", "author": "a", "date": "d"} for i in range(100)]
+    assert not service._needs_map(commits, service._build_git_log(commits))
+    assert service._needs_map(commits, "x" * (service.map_min_chars + 1))
+
+
+def test_parse_classification_rejects_out_of_range_numbers():
+    entries = {"Features": [{"text": "Added x", "commits": [4]}]}
+    assert AIService._parse_classification(json.dumps(entries), 3) is None
+    assert AIService._parse_classification(json.dumps(entries), 4) == entries
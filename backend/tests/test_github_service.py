@@ -0,0 +1,75 @@
+"""
+Tests for GitHubService against a mocked GitHub API (httpx.MockTransport)
+"""
+
+import asyncio
+import os
+import sys
+
+import httpx
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.github_service import GitHubService
+
+
+COMMIT = {
+    "sha": "a83b1c9d2e4f",
+    "html_url": "https://github.com/new-owner/name/commit/a83b1c9d2e4f",
+    "author": {"login": "jdoe"},
+    "commit": {"message": "Add login page", "author": {"name": "John Doe", "date": "2026-01-02T10:00:00Z"}},
+}
+
+
+def test_renamed_repository_redirect_is_followed():
+    def handler(request):
+        if request.url.path == "/repos/old/name/commits":
+            return httpx.Response(301, headers={
+                "Location": "https://api.github.com/repositories/42/commits?per_page=100"
+            })
+        assert request.url.path == "/repositories/42/commits"
+        return httpx.Response(200, json=[COMMIT])
+
+    async def fetch():
+        service = GitHubService(transport=httpx.MockTransport(handler))
+        try:
+            return await service.fetch_repo_commits("t", "old", "name")
+        finally:
+            await service.aclose()
+
+    assert asyncio.run(fetch()) == {
+        "success": True,
+        "commits": [{
+            "hash": "a83b1c9",
+            "message": "Add login page",
+            "author": "jdoe",
+            "date": "2026-01-02T10:00:00Z",
+            "url": "https://github.com/new-owner/name/commit/a83b1c9d2e4f",
+        }],
+        "count": 1,
+    }
+
+
+def test_not_modified_page_is_answered_from_reduced_cache():
+    statuses = []
+
+    def handler(request):
+        if request.headers.get("If-None-Match") == '"e1"':
+            statuses.append(304)
+            return httpx.Response(304)
+        statuses.append(200)
+        return httpx.Response(200, json=[COMMIT], headers={"ETag": '"e1"'})
+
+    async def fetch_twice():
+        service = GitHubService(transport=httpx.MockTransport(handler))
+        try:
+            first = await service.fetch_repo_commits("t", "owner", "name")
+            second = await service.fetch_repo_commits("t", "owner", "name")
+            return first, second, [entry["data"] for entry in service.response_cache._data.values()]
+        finally:
+            await service.aclose()
+
+    first, second, cached = asyncio.run(fetch_twice())
+    assert statuses == [200, 304]
+    assert first == second and first["count"] == 1
+    assert cached == [first["commits"]]
@@ -0,0 +1,77 @@
+"""
+Tests for the /api/generate-from-text parsers in services/log_parser.py:
+parse_pasted_log is checked against the original line-by-line strip/split
+parser it replaced, and parse_cli_log against the CLI's git log output.
+"""
+
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from services.log_parser import parse_cli_log, parse_pasted_log
+
+
+def parse_pasted_log_reference(git_log_text):
+    """The original per-line parser"""
+    commits = []
+    for idx, line in enumerate(git_log_text.strip().split('\n')):
+        line = line.strip()
+        if not line:
+            continue
+
+        parts = line.split(' ', 1)
+        if len(parts) >= 2:
+            hash_val = parts[0]
+            message = parts[1]
+        else:
+            hash_val = f"commit-{idx}"
+            message = line
+
+        commits.append({
+            "hash": hash_val,
+            "message": message,
+            "author": "Unknown",
+            "date": ""
+        })
+    return commits
+
+
+def test_unicode_whitespace_is_stripped():
+    assert parse_pasted_log('\xa0abc fix bug\xa0') == [
+        {"hash": "abc", "message": "fix bug", "author": "Unknown", "date": ""}
+    ]
+
+
+def test_hashless_lines_use_line_number_placeholder():
+    assert parse_pasted_log('\n\nfirst\n\nsecond') == parse_pasted_log_reference('\n\nfirst\n\nsecond')
+    assert [c["hash"] for c in parse_pasted_log('\n\nfirst\n\nsecond')] == ["commit-0", "commit-2"]
+
+
+def test_matches_reference_parser_on_random_input():
+    pieces = [
+        "a83b1c9", "fix(auth):", "bug", "x", " ", "  ", "\t", "\r", "\xa0", " ",
+        "\x0b", "\x0c", "\x1c", "\x85", "\u2028", "\u3000", " ", "\n", "\n\n", "é", "-", "M\tpath.py",
+    ]
+    rng = random.Random(0)
+    for _ in range(20000):
+        text = "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+        assert parse_pasted_log(text) == parse_pasted_log_reference(text), repr(text)
+
+
+def test_cli_log_groups_file_lines_under_their_commit():
+    text = (
+        "a83b1c9|Nov 04, 10:00 AM|John Doe|Add login | signup pages\n"
+        "A\tauth.py\n"
+        "M\tapp.py\n"
+        "\n"
+        "b1d4e2a|Nov 03, 02:30 PM|Jane Smith|Fix crash\n"
+        "D\told.js\n"
+    )
+    assert parse_cli_log(text) == [
+        {"hash": "a83b1c9", "message": "Add login | signup pages", "author": "John Doe",
+         "date": "Nov 04, 10:00 AM", "files": ["A\tauth.py", "M\tapp.py"]},
+        {"hash": "b1d4e2a", "message": "Fix crash", "author": "Jane Smith",
+         "date": "Nov 03, 02:30 PM", "files": ["D\told.js"]},
+    ]
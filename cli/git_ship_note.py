@@ -2,26 +2,45 @@
 
 import subprocess
 import requests
+from requests.adapters import HTTPAdapter
 import argparse
 import tempfile
 import shutil
 import os
+import re
 import sys
 import stat
 from rich.console import Console
+from rich.style import Style
+from rich.text import Text
 
 console = Console()
 
 API_URL = os.getenv("GITSCRIBE_API", "http://localhost:5000")
 
+# One session for all backend calls so the connection is reused (keep-alive)
+_SESSION = requests.Session()
+_SESSION.mount("http://", HTTPAdapter(pool_maxsize=8))
+_SESSION.mount("https://", HTTPAdapter(pool_maxsize=8))
+
+# Commit header lines of get_raw_git_log's format ("<short hash>|<date>|<author>|<subject>");
+# --name-status lines start with a status letter, so paths containing '|' are not counted
+COMMIT_LINE_RE = re.compile(r'^[0-9a-f]{7,}\|')
+
 def clone_repo(git_url, depth=100):
     temp_dir = tempfile.mkdtemp(prefix="gitscribe_repo_")
     console.print(f"Cloning repository (last {depth} commits)...")
     result = subprocess.run(
-        ["git", "clone", "--depth", str(depth), git_url, temp_dir],
+        # Only commit metadata of the default branch is read: skip tags, other branches,
+        # file contents (partial clone; get_raw_git_log turns off rename detection so
+        # git log never fetches blobs) and the checkout
+        ["git", "clone", "--depth", str(depth), "--no-tags", "--single-branch",
+         "--filter=blob:none", "--no-checkout", git_url, temp_dir],
         stdout=subprocess.PIPE,
         stderr=subprocess.PIPE,
         text=True,
+        # Fail instead of waiting on a credentials prompt (private or mistyped URLs)
+        env={**os.environ, "GIT_TERMINAL_PROMPT": "0"},
     )
     if result.returncode != 0:
         console.print(f"Git clone failed:\n{result.stderr}")
@@ -38,26 +57,41 @@ def get_raw_git_log(repo_path, limit=100):
         "git", "-C", repo_path, "log", f"-{limit}",
         '--pretty=format:%h|%cd|%an|%s',
         '--date=format:%b %d, %I:%M %p',
-        '--name-status'  # Shows file changes (A=added, M=modified, D=deleted)
+        '--name-status',  # Shows file changes (A=added, M=modified, D=deleted)
+        # Rename detection compares file contents, which a blob:none clone would
+        # fetch from the remote one commit at a time; renames show as D + A instead
+        '--no-renames'
     ]
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        console.print("Failed to get git log")
-        sys.exit(1)
-    
-    # Count actual commits retrieved
-    commits = [line for line in result.stdout.strip().split('\n') if '|' in line]
-    actual_count = len(commits)
+    # Stream the output instead of buffering it all, counting commits as lines arrive.
+    # stderr goes to a temp file rather than a pipe, so a chatty git cannot fill an
+    # unread pipe and stall, and its error message is still there to show on failure
+    with tempfile.TemporaryFile() as stderr_file:
+        proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file, text=True, bufsize=1)
+        lines = []
+        actual_count = 0
+        is_commit_line = COMMIT_LINE_RE.match
+        for line in proc.stdout:
+            line = line.rstrip('\n')
+            if is_commit_line(line):
+                actual_count += 1
+            lines.append(line)
+        if proc.wait() != 0:
+            stderr_file.seek(0)
+            error = stderr_file.read().decode('utf-8', errors='replace').strip()
+            console.print(f"Failed to get git log:\n{error}" if error else "Failed to get git log")
+            sys.exit(1)
     
     console.print(f"{actual_count} commit{'s' if actual_count != 1 else ''} extracted")
-    return result.stdout.strip(), actual_count
+    return '\n'.join(lines).strip(), actual_count
 
 def generate_changelog(raw_log, api_url):
     console.print("Sending commit data to AI backend for changelog generation...")
     try:
-        response = requests.post(
+        response = _SESSION.post(
             url=f"{api_url}/api/generate-from-text",
-            json={"git_log_text": raw_log},
+            # Raw text body: no JSON encoding here or parsing on the server
+            data=raw_log.encode("utf-8"),
+            headers={"Content-Type": "text/plain; charset=utf-8"},
             timeout=90
         )
     except requests.RequestException as e:
@@ -76,37 +110,47 @@ def generate_changelog(raw_log, api_url):
         console.print(f"Request failed with status code {response.status_code}")
         sys.exit(1)
 
-def remove_readonly(func, path, excinfo):
-    os.chmod(path, stat.S_IWRITE)
-    func(path)
-
 def remove_readonly_and_delete(path):
-    shutil.rmtree(path, onerror=remove_readonly)
+    # Windows refuses to delete read-only files (git marks its pack files read-only),
+    # so clear the flag in one walk first; POSIX only needs the directories writable
+    if sys.platform == "win32":
+        for root, dirs, files in os.walk(path):
+            for name in files:
+                os.chmod(os.path.join(root, name), stat.S_IWRITE)
+    shutil.rmtree(path)
+
+# Section keyword (lowercase) -> color used for its header in the terminal
+SECTION_COLORS = {
+    'features': 'green',
+    'fixes': 'red',
+    'improvements': 'blue',
+    'documentation': 'cyan',
+    'deletions': 'magenta',
+    'other': 'yellow'
+}
+
+# Bold styles by color name, built once instead of parsing markup on every line
+BOLD_STYLES = {color: Style(bold=True, color=color)
+               for color in {*SECTION_COLORS.values(), 'white', 'yellow'}}
+WHITE = Style(color='white')
 
 def display_changelog_terminal(changelog_text, commit_count):
     """Display changelog in terminal with colors and formatting"""
     
+    # Assemble one pre-styled Text and render it with a single console.print() at the end
+    text = Text()
+    title = BOLD_STYLES['yellow']
+    
     # Simple big yellow title with commit count
-    console.print("\n")
-    console.print("[bold yellow]" + "="*70 + "[/bold yellow]")
-    console.print("[bold yellow]                            CHANGELOG                              [/bold yellow]")
-    console.print(f"[bold yellow]                      (Last {commit_count} commit{'s' if commit_count != 1 else ''})                     [/bold yellow]")
-    console.print("[bold yellow]" + "="*70 + "[/bold yellow]")
-    console.print("\n")
+    text.append("\n\n")
+    text.append("="*70 + "\n", style=title)
+    text.append("                            CHANGELOG                              \n", style=title)
+    text.append(f"                      (Last {commit_count} commit{'s' if commit_count != 1 else ''})                     \n", style=title)
+    text.append("="*70 + "\n", style=title)
+    text.append("\n\n")
     
     # Parse and display sections with colors
-    lines = changelog_text.strip().split('\n')
-    
-    section_colors = {
-        'Features': 'green',
-        'Fixes': 'red',
-        'Improvements': 'blue',
-        'Documentation': 'cyan',
-        'Deletions': 'magenta',
-        'Other': 'yellow'
-    }
-    
-    for line in lines:
+    for line in changelog_text.strip().split('\n'):
         line = line.strip()
         if not line:
             continue
@@ -114,59 +158,51 @@ def display_changelog_terminal(changelog_text, commit_count):
         # Section headers
         if line.startswith('## '):
             section_name = line.replace('##', '').strip().rstrip(':')
-            color = 'white'
-            
-            # Find matching color
-            for key, col in section_colors.items():
-                if key.lower() in section_name.lower():
-                    color = col
-                    break
+            section_lower = section_name.lower()
+            color = next((col for key, col in SECTION_COLORS.items() if key in section_lower), 'white')
             
             # Simple section header without lines
-            console.print(f"\n[bold {color}]*** {section_name.upper()} ***[/bold {color}]\n")
+            text.append("\n")
+            text.append(f"*** {section_name.upper()} ***", style=BOLD_STYLES[color])
+            text.append("\n\n")
         
         # Bullet points
         elif line.startswith('- '):
             item = line[2:].strip()
+            text.append("  ")
+            text.append("•", style=WHITE)
             
             # Highlight timestamps in yellow
             if '(' in item and ')' in item:
                 parts = item.rsplit('(', 1)
-                text_part = parts[0].strip()
-                time_part = '(' + parts[1]
-                console.print(f"  [white]•[/white] {text_part} [bold yellow]{time_part}[/bold yellow]")
+                text.append(f" {parts[0].strip()} ")
+                text.append('(' + parts[1], style=BOLD_STYLES['yellow'])
             else:
-                console.print(f"  [white]•[/white] {item}")
+                text.append(f" {item}")
             
             # Add extra space after each bullet point
-            console.print()
+            text.append("\n\n")
     
-    console.print("\n" + "="*70 + "\n")
+    text.append("\n" + "="*70 + "\n\n")
+    console.print(text, end="")
+
+# Lines kept in the markdown file (ignoring surrounding whitespace): "## Section[:]" headers
+# (group 1 = name) and "- item" bullets (group 2); everything else is dropped
+MD_LINE_RE = re.compile(r'^[^\S\n]*(?:##[^\S\n]+(\S.*?)|(- .*\S))[^\S\n]*$', re.MULTILINE)
 
 def format_changelog_md(changelog_text, commit_count):
     """Format changelog for markdown file"""
-    formatted = "# CHANGELOG\n\n"
-    formatted += f"*Last {commit_count} commit{'s' if commit_count != 1 else ''}*\n\n"
-    formatted += "---\n\n"
-    
-    # Parse and format
-    lines = changelog_text.strip().split('\n')
-    
-    for line in lines:
-        line = line.strip()
-        if not line:
-            continue
-        
-        # Section headers
-        if line.startswith('## '):
-            section_name = line.replace('##', '').strip().rstrip(':')
-            formatted += f"\n### {section_name.upper()}\n\n"
-        
-        # Bullet points with extra spacing
-        elif line.startswith('- '):
-            formatted += line + "\n\n"
+    header = (
+        "# CHANGELOG\n\n"
+        f"*Last {commit_count} commit{'s' if commit_count != 1 else ''}*\n\n"
+        "---\n\n"
+    )
     
-    return formatted
+    # Section headers become uppercase "###" headings; bullet points get extra spacing
+    return header + "".join(
+        f"\n### {name.rstrip(':').upper()}\n\n" if name is not None else f"{bullet}\n\n"
+        for name, bullet in (match.groups() for match in MD_LINE_RE.finditer(changelog_text))
+    )
 
 def save_to_temp_markdown(changelog_text, commit_count):
     """Save changelog to temporary markdown file and open it"""
@@ -190,31 +226,36 @@ def save_to_temp_markdown(changelog_text, commit_count):
         else:
             subprocess.call(["xdg-open", filepath])
 
+# Prompts and retry messages styled once, so re-asking does not re-parse markup
+SAVE_PROMPT = Text.assemble("\n", ("Do you want to create a Markdown file for better visibility? (yes/no):", "cyan"), " ")
+SAVE_RETRY = Text("Please enter 'yes' or 'no'", style="red")
+COUNT_PROMPT = Text.assemble(("How many commits do you want to analyze? (1-100, default 50):", "cyan"), " ")
+COUNT_RANGE_RETRY = Text("Please enter a number between 1 and 100", style="red")
+COUNT_NUMBER_RETRY = Text("Please enter a valid number", style="red")
+YES_NO = {'yes': True, 'y': True, 'no': False, 'n': False}
+
 def ask_save_to_file():
     """Ask user if they want to save changelog to markdown file"""
     while True:
-        response = console.input("\n[cyan]Do you want to create a Markdown file for better visibility? (yes/no):[/cyan] ").strip().lower()
-        if response in ['yes', 'y']:
-            return True
-        elif response in ['no', 'n']:
-            return False
-        else:
-            console.print("[red]Please enter 'yes' or 'no'[/red]")
+        answer = YES_NO.get(console.input(SAVE_PROMPT).strip().lower())
+        if answer is not None:
+            return answer
+        console.print(SAVE_RETRY)
 
 def get_commit_count():
     """Ask user how many commits to analyze (1-100)"""
     while True:
         try:
-            response = console.input("[cyan]How many commits do you want to analyze? (1-100, default 50):[/cyan] ").strip()
+            response = console.input(COUNT_PROMPT).strip()
             if not response:
                 return 50  # Default
             count = int(response)
             if 1 <= count <= 100:
                 return count
             else:
-                console.print("[red]Please enter a number between 1 and 100[/red]")
+                console.print(COUNT_RANGE_RETRY)
         except ValueError:
-            console.print("[red]Please enter a valid number[/red]")
+            console.print(COUNT_NUMBER_RETRY)
 
 def main():
     parser = argparse.ArgumentParser(description="GitScribe CLI - Generate a changelog from a GitHub repo URL")
@@ -26,7 +26,7 @@ import { Separator } from "@/components/ui/separator";
 import { toast } from "sonner";
 import { GitHubConnectModal } from "@/components/GitHubConnectModal";
 import { About } from "@/components/About";
-import { generateFromText, checkHealth, generateFromGitHub } from "@/lib/api";
+import { generateFromText, checkHealth, generateFromGitHubStream } from "@/lib/api";
 import {
   getAccessToken,
   isValidGitHubUrl,
@@ -46,6 +46,9 @@ export default function Page() {
   const [githubUsername, setGithubUsername] = useState("");
   const [githubRepoUrl, setGithubRepoUrl] = useState("");
   const [isGeneratingFromGitHub, setIsGeneratingFromGitHub] = useState(false);
+  const [githubStage, setGithubStage] = useState<"fetching" | "generating">(
+    "fetching"
+  );
 
   // Initialize and persist theme
   useEffect(() => {
@@ -188,10 +191,17 @@ docs(readme): update installation steps
     }
 
     setIsGeneratingFromGitHub(true);
+    setGithubStage("fetching");
     setChangelog("");
 
     try {
-      const result = await generateFromGitHub(accessToken, githubRepoUrl);
+      // Notes are shown piece by piece while Claude is still writing them
+      const result = await generateFromGitHubStream(
+        accessToken,
+        githubRepoUrl,
+        setGithubStage,
+        (text) => setChangelog((current) => current + text)
+      );
 
       if (result.success && result.notes) {
         setChangelog(result.notes);
@@ -459,11 +469,13 @@ d1a6e4f docs: update API documentation
                   </CardDescription>
                 </CardHeader>
                 <CardContent className="pt-6 pb-6">
-                  {isGenerating || isGeneratingFromGitHub ? (
+                  {isGenerating || (isGeneratingFromGitHub && !changelog) ? (
                     <div className="flex flex-col items-center justify-center min-h-[320px] text-slate-400 dark:text-slate-500">
                       <Loader2 className="w-12 h-12 animate-spin mb-4 text-blue-600 dark:text-blue-400" />
                       <p className="animate-pulse">
-                        Generating your changelog...
+                        {isGeneratingFromGitHub && githubStage === "fetching"
+                          ? "Fetching commits from GitHub..."
+                          : "Generating your changelog..."}
                       </p>
                     </div>
                   ) : changelog ? (
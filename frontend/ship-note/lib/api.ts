@@ -95,6 +95,15 @@ export interface GenerateFromGitHubResponse {
   error?: string;
 }
 
+export interface StreamEvent {
+  stage?: "fetching" | "generating";
+  commits?: Commit[];
+  text?: string;
+  done?: boolean;
+  commit_count?: number;
+  error?: string;
+}
+
 // Get the API base URL from environment variable
 const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || "http://localhost:5000";
 
@@ -144,6 +153,35 @@ export async function generateNotes(
   return response.json();
 }
 
+/**
+ * Read a Server-Sent Events body and call onEvent with each parsed JSON event
+ */
+async function readServerSentEvents(
+  body: ReadableStream<Uint8Array>,
+  onEvent: (event: StreamEvent) => void
+): Promise<void> {
+  const reader = body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) break;
+    buffer += decoder.decode(value, { stream: true });
+
+    // Events are separated by a blank line
+    let boundary = buffer.indexOf("\n\n");
+    while (boundary !== -1) {
+      const message = buffer.slice(0, boundary);
+      buffer = buffer.slice(boundary + 2);
+      if (message.startsWith("data: ")) {
+        onEvent(JSON.parse(message.slice(6)));
+      }
+      boundary = buffer.indexOf("\n\n");
+    }
+  }
+}
+
 /**
  * Fetch commits from a local git repository
  * @param repoPath - Absolute path to the git repository
@@ -425,3 +463,80 @@ export async function generateFromGitHub(
     throw error;
   }
 }
+
+/**
+ * Streaming version of generateFromGitHub: the backend reports each stage
+ * (fetching commits, generating notes) and then streams the notes as Claude
+ * writes them.
+ * @param accessToken - GitHub access token
+ * @param repoUrl - GitHub repository URL
+ * @param onStage - Called when the backend moves to a new stage
+ * @param onChunk - Called with each new piece of the notes
+ * @param since - Start date (ISO 8601 format, optional)
+ * @param until - End date (ISO 8601 format, optional)
+ * @param limit - Maximum number of commits (default: 100)
+ */
+export async function generateFromGitHubStream(
+  accessToken: string,
+  repoUrl: string,
+  onStage: (stage: "fetching" | "generating") => void,
+  onChunk: (text: string) => void,
+  since?: string,
+  until?: string,
+  limit?: number
+): Promise<GenerateFromGitHubResponse> {
+  let response: Response;
+  try {
+    response = await fetch(`${API_BASE_URL}/api/github/generate-from-url`, {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({
+        access_token: accessToken,
+        repo_url: repoUrl,
+        since,
+        until,
+        limit,
+        stream: true,
+      }),
+    });
+  } catch (error) {
+    if (error instanceof TypeError && error.message === "Failed to fetch") {
+      throw new Error(
+        "Could not connect to backend server. Please ensure the Flask server is running on port 5000."
+      );
+    }
+    throw error;
+  }
+
+  if (!response.ok || !response.body) {
+    const errorData = await response
+      .json()
+      .catch(() => ({ error: "Failed to generate from GitHub" }));
+    throw new Error(
+      errorData.error || `HTTP error! status: ${response.status}`
+    );
+  }
+
+  const result: GenerateFromGitHubResponse = { success: true };
+  let notes = "";
+  await readServerSentEvents(response.body, (event) => {
+    if (event.error) {
+      throw new Error(event.error);
+    }
+    if (event.stage) {
+      onStage(event.stage);
+    }
+    if (event.commits) {
+      result.commits = event.commits;
+      result.commit_count = event.commit_count;
+    }
+    if (event.text) {
+      notes += event.text;
+      onChunk(event.text);
+    }
+  });
+  result.notes = notes;
+  return result;
+}